@@ -0,0 +1,110 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from well_import import SCHEMAS, import_file, validate_chunk
+
+WELLS = SCHEMAS['wells']
+
+
+def make_csv(rows, columns=None):
+    columns = columns or list(rows[0])
+    return io.StringIO(pd.DataFrame(rows, columns=columns).to_csv(index=False))
+
+
+def make_row(well_id, **values):
+    row = {'Well_ID': well_id, 'Platform': 'Platform_Alpha', 'Master_Valve': 'Pass', 'Swab_Valve': 'Pass',
+           'Wing_Valve': 'Pass', 'Next_PM_Due': '2025-06-01', 'Integrity_Issues': 'None', 'Priority': 'Low'}
+    row.update(values)
+    return row
+
+
+def reasons(rows, **kwargs):
+    chunk = pd.DataFrame(rows, dtype=object)
+    _, rejected = validate_chunk(chunk, WELLS, **kwargs)
+    return rejected['Reason'].tolist()
+
+
+def test_missing_required_column_raises():
+    with pytest.raises(ValueError, match='Missing required columns: Next_PM_Due'):
+        validate_chunk(pd.DataFrame([{'Well_ID': 'W1', 'Master_Valve': 'Pass', 'Swab_Valve': 'Pass',
+                                      'Wing_Valve': 'Pass'}]), WELLS)
+
+
+def test_required_and_allowed_values():
+    assert reasons([make_row(''), make_row('W2', Master_Valve='Leaking'), make_row('W3', Priority='Urgent'),
+                    make_row('W4', Swab_Valve='')]) == \
+        ['missing Well_ID', 'invalid Master_Valve', 'invalid Priority', 'missing Swab_Valve']
+
+
+def test_dates_are_strict():
+    rows = [make_row('W1', Next_PM_Due='2025-02-03'), make_row('W2', Next_PM_Due='02/03/2025'),
+            make_row('W3', Next_PM_Due='today'), make_row('W4', Next_PM_Due='13/02/2025')]
+    accepted, rejected = validate_chunk(pd.DataFrame(rows), WELLS)
+    assert accepted['Next_PM_Due'].tolist() == ['2025-02-03', '2025-02-03']
+    assert rejected['Reason'].tolist() == ['invalid date in Next_PM_Due'] * 2
+    # Rejected rows keep what the source said
+    assert rejected['Next_PM_Due'].tolist() == ['today', '13/02/2025']
+
+
+def test_dayfirst_dates():
+    rows = [make_row('W1', Next_PM_Due='02/03/2025'), make_row('W2', Next_PM_Due='13.02.2025')]
+    accepted, rejected = validate_chunk(pd.DataFrame(rows), WELLS, dayfirst=True)
+    assert accepted['Next_PM_Due'].tolist() == ['2025-03-02', '2025-02-13']
+    assert rejected.empty
+
+
+def test_numeric_ranges():
+    rows = [make_row('W1', Latitude='58.4', Longitude='1.9'), make_row('W2', Latitude='91', Longitude='1.9'),
+            make_row('W3', Latitude='58.4', Longitude='east'), make_row('W4', Latitude='', Longitude='')]
+    accepted, rejected = validate_chunk(pd.DataFrame(rows), WELLS)
+    assert accepted['Well_ID'].tolist() == ['W1', 'W4']
+    assert accepted['Latitude'].iloc[0] == 58.4 and np.isnan(accepted['Latitude'].iloc[1])
+    assert rejected['Reason'].tolist() == ['invalid Latitude', 'invalid Longitude']
+
+
+def test_later_rows_win_within_and_across_chunks():
+    rows = [make_row('W1', Priority='Low'), make_row('W2'), make_row('W1', Priority='High'),
+            make_row('W3'), make_row('W1', Priority='Critical'), make_row('W2', Priority='Medium')]
+    result = import_file(make_csv(rows), 'wells', chunksize=2)
+    data = result.data.set_index('Well_ID')
+    assert sorted(data.index) == ['W1', 'W2', 'W3']
+    assert data.loc['W1', 'Priority'] == 'Critical'
+    assert data.loc['W2', 'Priority'] == 'Medium'
+    assert result.rows_read == 6 and result.accepted_count == 6
+
+
+def test_reject_row_numbers_match_source_lines(tmp_path):
+    rows = [make_row('W1'), make_row('W2', Wing_Valve='?'), make_row('W3'), make_row('W4', Next_PM_Due='soon')]
+    rejects_path = tmp_path / 'rejects.csv'
+    result = import_file(make_csv(rows), 'wells', chunksize=3, rejects_path=str(rejects_path))
+    # Header is line 1, so the second and fourth data rows are lines 3 and 5
+    assert result.reject_samples['Row'].tolist() == [3, 5]
+    written = pd.read_csv(rejects_path, keep_default_na=False)
+    assert written['Row'].tolist() == [3, 5]
+    assert written['Reason'].tolist() == ['invalid Wing_Valve', 'invalid date in Next_PM_Due']
+    assert list(written.columns) == ['Row'] + WELLS['columns'] + ['Reason']
+
+
+def test_partial_columns_update_only_present_columns():
+    existing = pd.DataFrame([{**make_row('W1', Integrity_Issues='Swab leak', Priority='High'),
+                              'Well_Type': 'Producer', 'Status': 'Active', 'Last_Intervention': '2024-12-10',
+                              'Latitude': 58.4, 'Longitude': 1.9}])
+    update = [{'Well_ID': 'W1', 'Master_Valve': 'Fail', 'Swab_Valve': 'Pass', 'Wing_Valve': 'Pass',
+               'Next_PM_Due': '2025-09-01'},
+              {'Well_ID': 'W2', 'Master_Valve': 'Pass', 'Swab_Valve': 'Pass', 'Wing_Valve': 'Pass',
+               'Next_PM_Due': '2025-10-01'}]
+    data = import_file(make_csv(update), 'wells', existing=existing).data.set_index('Well_ID')
+
+    w1 = data.loc['W1']
+    assert (w1['Master_Valve'], w1['Next_PM_Due']) == ('Fail', '2025-09-01')
+    assert (w1['Integrity_Issues'], w1['Priority'], w1['Platform']) == ('Swab leak', 'High', 'Platform_Alpha')
+    assert w1['Latitude'] == 58.4
+
+    # New keys get defaults for the columns the file does not have
+    w2 = data.loc['W2']
+    assert w2['Integrity_Issues'] == 'None'
+    assert pd.isna(w2['Priority']) and np.isnan(w2['Latitude'])
+    assert isinstance(data['Master_Valve'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from well_map import ClusterLevels, GridIndex, MAX_CLUSTER_ZOOM, haversine_km
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(-60, 60, 5000)
+    lons = rng.uniform(-180, 180, 5000)
+    # A field straddling the antimeridian plus some unlocated wells
+    lats[:300] = rng.uniform(-17, -15, 300)
+    lons[:300] = (rng.uniform(178, 182, 300) + 180) % 360 - 180
+    lats[300:310] = np.nan
+    return lats, lons
+
+
+def brute_bbox(lats, lons, south, west, north, east):
+    inside = (lats >= south) & (lats <= north)
+    if west <= east:
+        inside &= (lons >= west) & (lons <= east)
+    else:
+        inside &= (lons >= west) | (lons <= east)
+    return np.flatnonzero(inside)
+
+
+@pytest.mark.parametrize('lat, lon, radius_km', [(-16.0, 179.9, 150), (-16.0, -179.5, 60), (40.0, 10.0, 800),
+                                                 (0.0, 0.0, 5)])
+def test_within_radius_matches_brute_force(points, lat, lon, radius_km):
+    lats, lons = points
+    positions, distances = GridIndex(lats, lons).within_radius(lat, lon, radius_km)
+    brute = haversine_km(lat, lon, lats, lons)
+    expected = np.flatnonzero(brute <= radius_km)
+    assert sorted(positions) == sorted(expected)
+    assert np.all(np.diff(distances) >= 0)
+    np.testing.assert_allclose(distances, brute[positions])
+
+
+@pytest.mark.parametrize('bbox', [(-17.0, 179.0, -15.0, -179.0), (-17.0, 179.0, -15.0, 181.0),
+                                  (10.0, -20.0, 30.0, 45.0), (-90.0, -180.0, 90.0, 180.0)])
+def test_within_bbox_matches_brute_force(points, bbox):
+    lats, lons = points
+    south, west, north, east = bbox
+    expected = brute_bbox(lats, lons, south, (west + 180) % 360 - 180, north, (east + 180) % 360 - 180) \
+        if east - west < 360 else np.flatnonzero(np.isfinite(lats))
+    assert sorted(GridIndex(lats, lons).within_bbox(*bbox)) == sorted(expected)
+
+
+def test_nearest_on_sparse_grid():
+    # Points 5 degrees apart: the search radius has to grow well past one cell
+    lats, lons = np.meshgrid(np.arange(-40.0, 41.0, 5.0), np.arange(-40.0, 41.0, 5.0))
+    lats, lons = lats.ravel(), lons.ravel()
+    index = GridIndex(lats, lons)
+    positions, distances = index.nearest(11.0, 12.0, k=3)
+    brute = haversine_km(11.0, 12.0, lats, lons)
+    np.testing.assert_allclose(distances, np.sort(brute)[:3])
+    assert (lats[positions[0]], lons[positions[0]]) == (10.0, 10.0)
+    assert len(index.nearest(0.0, 0.0, k=1000)[0]) == len(lats)
+
+
+def test_cluster_counts_sum_to_located_wells(points):
+    lats, lons = points
+    levels = ClusterLevels(lats, lons, [f'W{i}' for i in range(len(lats))])
+    located = int(np.isfinite(lats).sum())
+    for zoom in range(MAX_CLUSTER_ZOOM + 1):
+        assert levels.level(zoom)['Count'].sum() == located
+    assert len(levels.level(2)) < len(levels.level(8)) <= len(levels.level(MAX_CLUSTER_ZOOM)) == located
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+
+from well_reports import assign_file_stems, generate_reports, pm_status
+
+
+def make_well(well_id, next_pm_due='2025-07-01'):
+    return {
+        'Well_ID': well_id, 'Platform': 'Platform_Alpha', 'Well_Type': 'Production', 'Status': 'Active',
+        'Last_Intervention': '2024-12-10', 'Next_PM_Due': next_pm_due, 'Master_Valve': 'Pass',
+        'Swab_Valve': 'Fail', 'Wing_Valve': 'Pass', 'Integrity_Issues': 'Swab leak', 'Priority': 'High',
+    }
+
+
+def test_file_stems_are_sanitised():
+    assert assign_file_stems(['15/9-F-14', '../escape']) == ['15_9-F-14', '_escape']
+
+
+def test_clashing_stems_get_distinct_suffixes():
+    stems = assign_file_stems(['15/9-F-14', '15_9-F-14', 'A1', 'a1'])
+    assert len({stem.lower() for stem in stems}) == 4
+    assert all(stem.startswith(prefix) for stem, prefix in zip(stems, ['15_9-F-14-', '15_9-F-14-', 'A1-', 'a1-']))
+
+
+def test_duplicate_well_ids_fail_instead_of_overwriting(tmp_path):
+    wells = pd.DataFrame([make_well('15/9-F-14'), make_well('15_9-F-14'), make_well('W1'), make_well('W1')])
+    paths, failures = generate_reports(wells, str(tmp_path), workers=1)
+    assert len(set(paths)) == 3
+    assert failures == [('W1', "Duplicate Well_ID; report not written")]
+
+
+def test_fleet_summary(tmp_path):
+    wells = pd.DataFrame([make_well('W1', '2000-01-01'), make_well('W2', '')])
+    generate_reports(wells, str(tmp_path), workers=1)
+    summary = pd.read_csv(os.path.join(tmp_path, 'fleet_summary.csv'))
+    assert summary['Overall_Status'].tolist() == ['Fail', 'Fail']
+    assert summary['PM_Status'].tolist() == ['Overdue', 'Unknown']
+
+
+def test_pm_status():
+    assert pm_status('2025-01-10', today='2025-01-01') == ('Due Soon', 9)
+    assert pm_status('2025-03-01', today='2025-01-01') == ('Scheduled', 59)
+    assert pm_status('', today='2025-01-01') == ('Unknown', None)
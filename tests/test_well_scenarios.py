@@ -0,0 +1,101 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import well_scenarios
+from well_scenarios import FRAMES, Plan, _bed_utilisation, _tool_utilisation, evaluate
+
+
+def make_schedule(rows):
+    return pd.DataFrame(rows, columns=['Platform', 'Tool', 'Start', 'End', 'Personnel'])
+
+
+@pytest.fixture
+def plan():
+    frames = {
+        'wells': pd.DataFrame({'Well_ID': ['W1', 'W2', 'W3'], 'Platform': ['Alpha', 'Alpha', 'Beta'],
+                               'Next_PM_Due': ['2025-01-20', '2025-03-01', '2024-12-01']}),
+        'tools': pd.DataFrame({'Tool_Equipment': ['Coiled Tubing', 'Slickline'], 'Units': [1, 2]}),
+        'bed_space': pd.DataFrame({'Platform': ['Alpha', 'Beta'], 'Total_Beds': [10, 5], 'Occupied_Beds': [4, 2]}),
+        'schedule': make_schedule([('Alpha', 'Coiled Tubing', '2025-01-01', '2025-01-03', 3)]),
+        'shutdowns': pd.DataFrame({'Platform': ['Alpha', 'Beta'], 'Next_Shutdown': ['2025-02-01', '2025-03-01'],
+                                   'Duration_Days': [3, 2], 'Crew': [2, 2]}),
+    }
+    return Plan(frames, as_of='2025-01-01')
+
+
+def test_fork_shares_every_frame(plan):
+    fork = plan.fork('Copy')
+    assert all(fork[f] is plan[f] for f in FRAMES)
+    assert fork.name == 'Copy' and fork.as_of == plan.as_of
+
+
+@pytest.mark.parametrize('change, frame', [
+    (lambda p: p.slip_shutdown('Alpha', 14), 'shutdowns'),
+    (lambda p: p.remove_tool_units('Slickline'), 'tools'),
+    (lambda p: p.defer_pm('Alpha', 30), 'wells'),
+])
+def test_change_replaces_only_its_frame(plan, change, frame):
+    scenario = change(plan.fork('What if'))
+    assert scenario[frame] is not plan[frame]
+    assert all(scenario[f] is plan[f] for f in FRAMES if f != frame)
+    assert len(scenario.changes) == 1
+
+
+def test_changes_do_not_modify_the_parent(plan):
+    plan.slip_shutdown('Alpha', 14).remove_tool_units('Slickline').defer_pm('Alpha', 30)
+    assert plan['shutdowns']['Next_Shutdown'].tolist() == ['2025-02-01', '2025-03-01']
+    assert plan['tools']['Units'].tolist() == [1, 2]
+    assert plan['wells']['Next_PM_Due'].tolist() == ['2025-01-20', '2025-03-01', '2024-12-01']
+
+
+def test_unknown_targets_raise(plan):
+    with pytest.raises(ValueError, match='No shutdown planned'):
+        plan.slip_shutdown('Gamma', 1)
+    with pytest.raises(ValueError, match='Unknown tool'):
+        plan.remove_tool_units('Wireline')
+    with pytest.raises(ValueError, match='No wells on Gamma'):
+        plan.defer_pm('Gamma', 1)
+
+
+def test_cached_kpis_reused_for_untouched_frames(plan, monkeypatch):
+    monkeypatch.setattr(well_scenarios, '_KPI_CACHE', OrderedDict())
+    baseline = evaluate(plan)
+    slipped = evaluate(plan.slip_shutdown('Alpha', 14))
+    # Shutdowns feed beds and PM-at-shutdown only
+    assert slipped['pm_status'] is baseline['pm_status']
+    assert slipped['tools'] is baseline['tools']
+    assert slipped['beds'] is not baseline['beds']
+    assert slipped['pm_at_shutdown'] is not baseline['pm_at_shutdown']
+    assert baseline['pm_at_shutdown'].to_dict() == {'Alpha': 1, 'Beta': 1}
+    assert slipped['pm_at_shutdown'].to_dict() == {'Alpha': 1, 'Beta': 1}
+    assert evaluate(plan.defer_pm('Alpha', 60))['pm_at_shutdown'].to_dict() == {'Alpha': 0, 'Beta': 1}
+
+
+def test_bed_utilisation_known_answer():
+    schedule = make_schedule([('Alpha', 'Slickline', '2025-01-01', '2025-01-03', 3),
+                              ('Alpha', 'Coiled Tubing', '2025-01-02', '2025-01-05', 4)])
+    shutdowns = pd.DataFrame({'Platform': ['Alpha'], 'Next_Shutdown': ['2025-01-03'], 'Duration_Days': [2],
+                              'Crew': [2]})
+    bed_space = pd.DataFrame({'Platform': ['Alpha', 'Beta'], 'Total_Beds': [10, 5], 'Occupied_Beds': [4, 2]})
+    beds = _bed_utilisation(schedule, shutdowns, bed_space, as_of=None)
+    # Alpha daily beds: 4 + [3, 7, 9, 6, 4] = [7, 11, 13, 10, 8]
+    assert beds.loc['Alpha', 'Peak_Beds'] == 13
+    assert beds.loc['Alpha', 'Peak_Utilisation_%'] == 130.0
+    assert beds.loc['Alpha', 'Over_Capacity_Days'] == 2
+    assert beds.loc['Beta'].tolist() == [5, 2, 40.0, 0]
+
+
+def test_tool_utilisation_known_answer():
+    schedule = make_schedule([('Alpha', 'Coiled Tubing', '2025-01-01', '2025-01-03', 3),
+                              ('Beta', 'Coiled Tubing', '2025-01-03', '2025-01-04', 3),
+                              ('Alpha', 'Slickline', '2025-01-02', '2025-01-02', 2),
+                              ('Beta', 'Wireline', '2025-01-05', '2025-01-05', 2)])
+    tools = pd.DataFrame({'Tool_Equipment': ['Coiled Tubing', 'Slickline', 'Wireline'], 'Units': [1, 2, 0]})
+    result = _tool_utilisation(schedule, tools, as_of=None)
+    assert result.loc['Coiled Tubing'].tolist() == [1, 2, 200.0, 1]
+    assert result.loc['Slickline'].tolist() == [2, 1, 50.0, 0]
+    assert result.loc['Wireline', 'Peak_Utilisation_%'] == np.inf
+    assert result.loc['Wireline', 'Conflict_Days'] == 1
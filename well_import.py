@@ -0,0 +1,357 @@
+"""Streaming CSV/Excel import of well, valve-test/PM and tools data.
+
+Files are read in chunks so multi-GB maintenance-system exports import with
+bounded memory. Each chunk is validated against the dataset schema, rejected
+rows are counted (and optionally written out with a reason), and accepted rows
+are coerced to categorical dtypes before being upserted into the app's frames.
+
+Command line:
+
+    python well_import.py wells valve_tests.csv --rejects rejected.csv
+"""
+
+import argparse
+import csv
+import os
+import zipfile
+from datetime import date, datetime
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Rejected rows kept in memory for display; the rest are only counted
+# unless a rejects file is given.
+MAX_REJECT_SAMPLES = 1000
+
+VALVE_RESULTS = ['Pass', 'Fail']
+
+# Accepted date formats, tried in order. Anything else is rejected rather than
+# guessed, so 01/02/2025 can only mean one thing for a given export.
+ISO_DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d',
+                    '%d-%b-%Y', '%d %b %Y', '%d %B %Y']
+DAY_FIRST_FORMATS = ['%d/%m/%Y', '%d.%m.%Y', '%d-%m-%Y']
+MONTH_FIRST_FORMATS = ['%m/%d/%Y', '%m-%d-%Y']
+
+# Dataset schemas: key column, required columns, allowed values for fixed
+# vocabularies, date columns, numeric columns with their valid range, and the
+# columns stored as categoricals. Dates are normalised to YYYY-MM-DD and kept
+# categorical since PM and test dates repeat heavily across a fleet.
+SCHEMAS = {
+    'wells': {
+        'key': 'Well_ID',
+        'columns': ['Well_ID', 'Platform', 'Well_Type', 'Status', 'Last_Intervention', 'Next_PM_Due',
+                    'Master_Valve', 'Swab_Valve', 'Wing_Valve', 'Integrity_Issues', 'Priority',
+                    'Latitude', 'Longitude'],
+        'required': ['Well_ID', 'Master_Valve', 'Swab_Valve', 'Wing_Valve', 'Next_PM_Due'],
+        'allowed': {
+            'Master_Valve': VALVE_RESULTS,
+            'Swab_Valve': VALVE_RESULTS,
+            'Wing_Valve': VALVE_RESULTS,
+            'Priority': ['Low', 'Medium', 'High', 'Critical'],
+        },
+        'dates': ['Last_Intervention', 'Next_PM_Due'],
+        'numeric': {'Latitude': (-90.0, 90.0), 'Longitude': (-180.0, 180.0)},
+        'categorical': ['Platform', 'Well_Type', 'Status', 'Last_Intervention', 'Next_PM_Due',
+                        'Master_Valve', 'Swab_Valve', 'Wing_Valve', 'Integrity_Issues', 'Priority'],
+        'defaults': {'Integrity_Issues': 'None'},
+    },
+    'tools': {
+        'key': 'Tool_Equipment',
+        'columns': ['Tool_Equipment', 'Category', 'Description', 'Status', 'Next_Maintenance', 'Units'],
+        'required': ['Tool_Equipment', 'Status', 'Next_Maintenance'],
+        'allowed': {
+            'Status': ['Available', 'In Use', 'Maintenance', 'Scheduled'],
+        },
+        'dates': ['Next_Maintenance'],
+        'numeric': {'Units': (0, 1000)},
+        'categorical': ['Category', 'Status', 'Next_Maintenance'],
+        'defaults': {},
+    },
+}
+
+
+class ImportResult:
+    """Outcome of an import: accepted frame plus rejected-row accounting."""
+
+    def __init__(self, data, rows_read, rejected_count, reject_samples):
+        self.data = data
+        self.rows_read = rows_read
+        self.rejected_count = rejected_count
+        self.reject_samples = reject_samples
+
+    @property
+    def accepted_count(self):
+        return self.rows_read - self.rejected_count
+
+
+def _read_excel_chunks(source, columns, chunksize):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportError("Excel import requires openpyxl: pip install openpyxl") from exc
+
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    # read_only mode streams rows instead of loading the whole sheet
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError) as exc:
+        raise ValueError(f"Could not read Excel file: {exc}") from exc
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else '' for h in next(rows, [])]
+        wanted = [i for i, h in enumerate(header) if h in columns]
+        names = [header[i] for i in wanted]
+        buffer = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in wanted]
+            # Formatted but empty trailing rows are not data
+            if all(v is None or (isinstance(v, str) and not v.strip()) for v in values):
+                continue
+            buffer.append(values)
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=names, dtype=object)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names, dtype=object)
+    finally:
+        workbook.close()
+
+
+def read_chunks(source, schema, chunksize=DEFAULT_CHUNK_SIZE, file_name=None):
+    """Yield raw DataFrame chunks from a CSV or Excel path or file object."""
+    name = file_name or (source if isinstance(source, str) else getattr(source, 'name', ''))
+    columns = schema['columns']
+    if str(name).lower().endswith(('.xlsx', '.xlsm')):
+        yield from _read_excel_chunks(source, columns, chunksize)
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False,
+                               usecols=lambda c: c.strip() in columns)
+
+
+def _iso_date(value):
+    # Excel date cells arrive as datetimes; keep only the date part
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+def parse_dates(values, dayfirst=False):
+    """Parse date strings against ISO_DATE_FORMATS plus the numeric day/month formats.
+
+    ``dayfirst`` selects DD/MM/YYYY (European exports) over MM/DD/YYYY. Each
+    row is parsed on its own, independent of the other rows' format; values
+    matching none of the formats come back as NaT.
+    """
+    formats = ISO_DATE_FORMATS + (DAY_FIRST_FORMATS if dayfirst else MONTH_FIRST_FORMATS)
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    # pandas maps 'today'/'now' to the clock whatever the format; a date has digits
+    leftover = values.str.contains(r'\d', regex=True)
+    for fmt in formats:
+        if not leftover.any():
+            break
+        parsed[leftover] = pd.to_datetime(values[leftover], format=fmt, errors='coerce').to_numpy()
+        leftover &= parsed.isna()
+    return parsed
+
+
+def validate_chunk(chunk, schema, first_row=0, dayfirst=False):
+    """Split a raw chunk into (accepted, rejected); rejected rows carry a Reason.
+
+    Only the schema columns present in the chunk are kept, so an upsert can
+    leave the others untouched. ``first_row`` is the source row number of the
+    chunk's first data row.
+    """
+    chunk = chunk.rename(columns=lambda c: str(c).strip())
+    missing = [c for c in schema['required'] if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    columns = [c for c in schema['columns'] if c in chunk.columns]
+    chunk = chunk[columns]
+    chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+
+    # Normalise to stripped strings; Excel cells may arrive as numbers or datetimes
+    dates = [c for c in schema['dates'] if c in columns]
+    numeric = {c: r for c, r in schema['numeric'].items() if c in columns}
+    for col in dates:
+        if chunk[col].dtype == object:
+            chunk[col] = chunk[col].map(_iso_date)
+    chunk = chunk.apply(lambda s: s.where(s.notna(), '').astype(str).str.strip())
+    for col, default in schema['defaults'].items():
+        if col in columns:
+            chunk.loc[chunk[col] == '', col] = default
+
+    reasons = pd.Series('', index=chunk.index)
+    normalised = {}
+    for col in schema['required']:
+        reasons = reasons.mask((chunk[col] == '') & (reasons == ''), f"missing {col}")
+    for col, allowed in schema['allowed'].items():
+        if col not in columns:
+            continue
+        bad = ~chunk[col].isin(allowed) & (chunk[col] != '')
+        reasons = reasons.mask(bad & (reasons == ''), f"invalid {col}")
+    for col in dates:
+        parsed = parse_dates(chunk[col], dayfirst)
+        bad = parsed.isna() & (chunk[col] != '')
+        reasons = reasons.mask(bad & (reasons == ''), f"invalid date in {col}")
+        normalised[col] = parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), '')
+    for col, (low, high) in numeric.items():
+        parsed = pd.to_numeric(chunk[col], errors='coerce')
+        bad = (parsed.isna() & (chunk[col] != '')) | ~parsed.between(low, high) & parsed.notna()
+        reasons = reasons.mask(bad & (reasons == ''), f"invalid {col}")
+        normalised[col] = parsed
+
+    # Rejected rows keep their raw values so they can be fixed at the source
+    rejected_mask = reasons != ''
+    rejected = chunk[rejected_mask].assign(Reason=reasons[rejected_mask])
+    accepted = chunk[~rejected_mask].assign(**{col: values[~rejected_mask] for col, values in normalised.items()})
+    return accepted, rejected
+
+
+def coerce_chunk(chunk, schema):
+    """Convert the schema's categorical columns to category dtype."""
+    chunk = chunk.copy()
+    for col in schema['categorical']:
+        if col not in chunk.columns:
+            continue
+        categories = schema['allowed'].get(col)
+        chunk[col] = pd.Categorical(chunk[col], categories=categories)
+    return chunk
+
+
+def concat_compact(frames, schema):
+    """Concatenate coerced frames with the same columns without falling back to object dtype."""
+    columns = frames[0].columns if frames else schema['columns']
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return coerce_chunk(pd.DataFrame(columns=columns), schema)
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    data = {}
+    for col in columns:
+        if col in schema['categorical']:
+            data[col] = union_categoricals([f[col] for f in frames], ignore_order=True)
+        else:
+            data[col] = pd.concat([f[col] for f in frames], ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def _fill_absent(incoming, schema):
+    # New keys get the schema default for columns the source lacks; otherwise blank,
+    # or missing where blank is not a valid value (numbers, fixed vocabularies)
+    absent = [c for c in schema['columns'] if c not in incoming.columns]
+    fill = {c: schema['defaults'].get(c, float('nan') if c in schema['numeric'] or c in schema['allowed'] else '')
+            for c in absent}
+    return coerce_chunk(incoming.assign(**fill)[schema['columns']], schema)
+
+
+def _overwrite(current, incoming, positions, hit):
+    # current with rows ``hit`` replaced by incoming[positions[hit]], keeping categoricals compact
+    if isinstance(current.dtype, pd.CategoricalDtype):
+        combined = union_categoricals([current, incoming], ignore_order=True)
+        codes = combined.codes[:len(current)].copy()
+        codes[hit] = combined.codes[len(current):][positions[hit]]
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=combined.dtype), index=current.index)
+    return current.where(~hit, pd.Series(incoming.to_numpy()[positions], index=current.index))
+
+
+def upsert(existing, incoming, schema):
+    """Update rows of ``existing`` sharing a key with ``incoming`` and append new ones.
+
+    Only the columns ``incoming`` has are overwritten on existing keys; the
+    rest keep their current values. New keys take schema defaults for them.
+    """
+    key = schema['key']
+    incoming = incoming.drop_duplicates(subset=key, keep='last')
+    if existing is None or not len(existing):
+        return _fill_absent(incoming, schema).reset_index(drop=True)
+    existing = coerce_chunk(existing[schema['columns']], schema).reset_index(drop=True)
+    positions = pd.Index(incoming[key].astype(str)).get_indexer(existing[key].astype(str))
+    hit = positions >= 0
+    if hit.any():
+        existing = existing.assign(**{col: _overwrite(existing[col], incoming[col], positions, hit)
+                                      for col in incoming.columns if col != key})
+    added = incoming[~incoming[key].isin(existing[key])]
+    return concat_compact([existing, _fill_absent(added, schema)], schema)
+
+
+def import_file(source, dataset, existing=None, chunksize=DEFAULT_CHUNK_SIZE, rejects_path=None,
+                file_name=None, progress=None, dayfirst=False):
+    """Stream ``source`` into the ``dataset`` ('wells' or 'tools') frame.
+
+    Later rows win when a key appears more than once, and a file with only
+    some of the schema columns updates just those columns for existing keys.
+    ``dayfirst`` reads numeric dates as DD/MM/YYYY. ``progress`` is called as
+    ``progress(rows_read)`` after each chunk.
+    """
+    schema = SCHEMAS[dataset]
+    key = schema['key']
+    imported = None
+    rows_read = 0
+    rejected_count = 0
+    reject_samples = []
+
+    rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8') if rejects_path else None
+    try:
+        rejects_writer = None
+        if rejects_file:
+            rejects_writer = csv.writer(rejects_file)
+            rejects_writer.writerow(['Row'] + schema['columns'] + ['Reason'])
+
+        for chunk in read_chunks(source, schema, chunksize, file_name):
+            # +2: one-based row numbers, after the header line
+            valid, rejected = validate_chunk(chunk, schema, first_row=rows_read + 2, dayfirst=dayfirst)
+            rows_read += len(chunk)
+            rejected_count += len(rejected)
+            if len(rejected):
+                if rejects_writer:
+                    rows = rejected.reindex(columns=schema['columns'] + ['Reason'], fill_value='')
+                    rejects_writer.writerows(rows.itertuples(index=True, name=None))
+                if len(reject_samples) < MAX_REJECT_SAMPLES:
+                    reject_samples.extend(rejected.head(MAX_REJECT_SAMPLES - len(reject_samples))
+                                          .rename_axis('Row').reset_index().to_dict('records'))
+            # Merge each chunk into the running result so memory tracks the
+            # number of distinct keys, not the number of rows read
+            valid = coerce_chunk(valid.drop_duplicates(subset=key, keep='last'), schema)
+            if imported is None:
+                imported = valid.reset_index(drop=True)
+            else:
+                imported = concat_compact([imported[~imported[key].isin(valid[key])], valid], schema)
+            if progress:
+                progress(rows_read)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    if imported is None:
+        imported = coerce_chunk(pd.DataFrame(columns=schema['columns']), schema)
+    data = upsert(existing, imported, schema)
+    return ImportResult(data, rows_read, rejected_count, pd.DataFrame(reject_samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import well or tools data from CSV/Excel exports")
+    parser.add_argument('dataset', choices=sorted(SCHEMAS), help="Target dataset")
+    parser.add_argument('source', help="CSV or .xlsx file")
+    parser.add_argument('--out', help="Write the imported dataset to this CSV")
+    parser.add_argument('--rejects', help="Write rejected rows with reasons to this CSV")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--dayfirst', action='store_true', help="Read numeric dates as DD/MM/YYYY")
+    args = parser.parse_args()
+
+    def report_progress(rows_read):
+        print(f"\r{rows_read:,} rows read", end='', flush=True)
+
+    result = import_file(args.source, args.dataset, chunksize=args.chunk_size,
+                         rejects_path=args.rejects, progress=report_progress, dayfirst=args.dayfirst)
+    print(f"\n✅ {result.accepted_count:,} rows accepted, {result.rejected_count:,} rejected, "
+          f"{len(result.data):,} unique {args.dataset}")
+    if args.out:
+        result.data.to_csv(args.out, index=False)
+        print(f"📁 Saved to {os.path.abspath(args.out)}")
+
+
+if __name__ == '__main__':
+    main()
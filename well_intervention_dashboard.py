@@ -5,8 +5,18 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import datetime
+import hashlib
+import os
+import tempfile
+import zipfile
 from datetime import timedelta
 import numpy as np
+from well_import import import_file
+from well_map import ClusterLevels, GridIndex, viewport_bbox
+from well_scenarios import Plan, compare, evaluate
+from well_reports import generate_reports, pm_statuses, sample_history, sample_production, write_well_report
+
+REPORTS_DIR = 'reports'
 
 # Set page config
 st.set_page_config(
@@ -76,7 +86,9 @@ def generate_sample_data():
         'Swab_Valve': ['Fail', 'Pass', 'Pass', 'Pass', 'Fail', 'Pass'],
         'Wing_Valve': ['Pass', 'Pass', 'Pass', 'Fail', 'Pass', 'Pass'],
         'Integrity_Issues': ['Swab leak', 'None', 'Master valve stuck', 'Wing valve leak', 'Swab leak', 'None'],
-        'Priority': ['High', 'Low', 'Critical', 'Medium', 'High', 'Low']
+        'Priority': ['High', 'Low', 'Critical', 'Medium', 'High', 'Low'],
+        'Latitude': [57.112, 57.338, 57.094, 56.915, 57.361, 56.887],
+        'Longitude': [1.862, 2.214, 1.831, 2.438, 2.187, 2.471]
     }
     
     # Tools and equipment data
@@ -92,7 +104,8 @@ def generate_sample_data():
         'Status': ['Available', 'In Use', 'Available', 'Maintenance', 'Available', 
                   'Available', 'In Use', 'Available', 'Scheduled', 'Available'],
         'Next_Maintenance': ['2025-03-15', '2025-04-20', '2025-02-28', '2025-02-10', '2025-05-01',
-                           '2025-03-30', '2025-04-15', '2025-02-25', '2025-06-01', '2025-03-10']
+                           '2025-03-30', '2025-04-15', '2025-02-25', '2025-06-01', '2025-03-10'],
+        'Units': [2, 2, 3, 1, 3, 1, 2, 2, 1, 2]
     }
     
     # Platform bed space data
@@ -104,6 +117,35 @@ def generate_sample_data():
         'Forecast_Change': ['+2 next week', '-3 next week', '+1 next week']
     }
     
+    # Platform locations
+    platforms_data = {
+        'Platform': ['Platform_Alpha', 'Platform_Beta', 'Platform_Gamma'],
+        'Latitude': [57.100, 57.350, 56.900],
+        'Longitude': [1.850, 2.200, 2.450]
+    }
+    
+    # Work schedule data
+    schedule_data = {
+        'Task': ['Well A - PM', 'Well B - Intervention', 'Well C - Repair', 'Well D - Testing'],
+        'Start': ['2025-02-01', '2025-02-05', '2025-02-10', '2025-02-20'],
+        'End': ['2025-02-03', '2025-02-08', '2025-02-14', '2025-02-22'],
+        'Platform': ['Platform_Alpha', 'Platform_Beta', 'Platform_Alpha', 'Platform_Gamma'],
+        'Status': ['Planned', 'In Progress', 'Planned', 'Planned'],
+        'Tool': ['Slickline Tools', 'Coiled Tubing', 'Workover Rig', 'Wireline Unit'],
+        'Personnel': [4, 8, 6, 3]
+    }
+    
+    # Shutdown maintenance plan data (the only source of shutdown windows;
+    # the Gantt chart and scenario bed loading both read it)
+    shutdown_data = {
+        'Platform': ['Platform_Alpha', 'Platform_Beta', 'Platform_Gamma'],
+        'Next_Shutdown': ['2025-04-15', '2025-06-20', '2025-08-10'],
+        'Duration_Days': [5, 7, 4],
+        'Planned_Work': ['Compressor overhaul, Valve testing', 'Turbine maintenance, Safety systems', 'Electrical upgrades, Piping'],
+        'Status': ['Planned', 'Scheduled', 'Planning'],
+        'Crew': [6, 8, 6]
+    }
+    
     # Work disciplines data
     disciplines_data = {
         'Discipline': ['Well Services', 'Subsea Engineering', 'Production Technology', 'Logistics & Marine', 
@@ -113,16 +155,38 @@ def generate_sample_data():
         'Certification_Level': ['Level 3', 'Level 4', 'Level 3', 'Level 2', 'Level 5', 'Level 3', 'Level 4', 'Level 3']
     }
     
-    return pd.DataFrame(wells_data), pd.DataFrame(tools_data), pd.DataFrame(bed_space_data), pd.DataFrame(disciplines_data)
+    return (pd.DataFrame(wells_data), pd.DataFrame(tools_data), pd.DataFrame(bed_space_data),
+            pd.DataFrame(disciplines_data), pd.DataFrame(platforms_data),
+            pd.DataFrame(schedule_data), pd.DataFrame(shutdown_data))
+
+# Spatial index and map clusters, rebuilt only when the coordinates change
+def points_digest(df, label_col):
+    """Stable digest of a frame's labels and coordinates, used as the spatial index cache key."""
+    hashes = pd.util.hash_pandas_object(df[[label_col, 'Latitude', 'Longitude']], index=False)
+    return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+# Keyed on the digest only: the leading underscore keeps Streamlit from hashing the frame itself
+@st.cache_resource(max_entries=8)
+def build_spatial_index(digest, _df, label_col):
+    lats = _df['Latitude'].to_numpy(dtype=float)
+    lons = _df['Longitude'].to_numpy(dtype=float)
+    return GridIndex(lats, lons), ClusterLevels(lats, lons, _df[label_col].astype(str).to_numpy())
 
 # Load data
-wells_df, tools_df, bed_space_df, disciplines_df = generate_sample_data()
+(wells_df, tools_df, bed_space_df, disciplines_df, platforms_df,
+ schedule_df, shutdown_df) = generate_sample_data()
+
+# Imported data replaces the sample frames for the rest of the session
+if 'wells_df' in st.session_state:
+    wells_df = st.session_state['wells_df']
+if 'tools_df' in st.session_state:
+    tools_df = st.session_state['tools_df']
 
 # Sidebar navigation
 st.sidebar.title("🛢️ Navigation")
 page = st.sidebar.selectbox("Select Page", [
     "Dashboard", "Wells Management", "Scheduling & Planning", "Tools & Equipment", 
-    "Logistics", "Work Disciplines", "Well History", "Integrity Management"
+    "Logistics", "Work Disciplines", "Well History", "Integrity Management", "Scenario Planning", "Data Import"
 ])
 
 # Main header
@@ -256,7 +320,30 @@ elif page == "Wells Management":
                     st.info(f"Opening history for {well['Well_ID']}")
             with col5:
                 if st.button(f"Generate Report - {well['Well_ID']}", key=f"report_{well['Well_ID']}"):
-                    st.info(f"Generating report for {well['Well_ID']}")
+                    os.makedirs(REPORTS_DIR, exist_ok=True)
+                    report_path = write_well_report(well, REPORTS_DIR)
+                    with open(report_path, 'rb') as report_file:
+                        st.download_button(f"Download Report - {well['Well_ID']}", report_file,
+                                           file_name=os.path.basename(report_path), mime='text/html',
+                                           key=f"download_{well['Well_ID']}")
+                    st.success(f"Report saved to {report_path}")
+    
+    # Fleet-wide batch reports
+    st.subheader("📄 Fleet Reports")
+    if st.button("Generate Reports for All Wells"):
+        report_progress = st.progress(0.0)
+        # Each run gets its own directory so concurrent sessions don't overwrite each other
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        run_dir = tempfile.mkdtemp(prefix=datetime.datetime.now().strftime('fleet_%Y%m%d_%H%M%S_'), dir=REPORTS_DIR)
+        report_paths, report_failures = generate_reports(
+            wells_df, run_dir,
+            progress=lambda done, total, failed: report_progress.progress(
+                done / total, text=f"{done}/{total} wells processed, {failed} failed")
+        )
+        st.success(f"{len(report_paths)} reports written to {run_dir}/")
+        if report_failures:
+            st.error(f"{len(report_failures)} reports failed")
+            st.dataframe(pd.DataFrame(report_failures, columns=['Well_ID', 'Error']), use_container_width=True)
 
 elif page == "Scheduling & Planning":
     st.header("📅 Scheduling & Work Planning")
@@ -264,20 +351,18 @@ elif page == "Scheduling & Planning":
     # Gantt chart simulation
     st.subheader("Work Schedule - Gantt Chart View")
     
-    # Sample scheduling data
-    schedule_data = {
-        'Task': ['Well A - PM', 'Well B - Intervention', 'Well C - Repair', 'Platform Alpha - Shutdown', 'Well D - Testing'],
-        'Start': ['2025-02-01', '2025-02-05', '2025-02-10', '2025-02-15', '2025-02-20'],
-        'End': ['2025-02-03', '2025-02-08', '2025-02-14', '2025-02-18', '2025-02-22'],
-        'Platform': ['Platform_Alpha', 'Platform_Beta', 'Platform_Alpha', 'Platform_Alpha', 'Platform_Gamma'],
-        'Status': ['Planned', 'In Progress', 'Planned', 'Scheduled', 'Planned']
-    }
-    
-    schedule_df = pd.DataFrame(schedule_data)
+    schedule_df = schedule_df.copy()
     schedule_df['Start'] = pd.to_datetime(schedule_df['Start'])
     schedule_df['End'] = pd.to_datetime(schedule_df['End'])
-    
-    fig_gantt = px.timeline(schedule_df, x_start="Start", x_end="End", y="Task", 
+    shutdown_start = pd.to_datetime(shutdown_df['Next_Shutdown'])
+    gantt_df = pd.concat([schedule_df, pd.DataFrame({
+        'Task': shutdown_df['Platform'].str.replace('_', ' ') + ' - Shutdown',
+        'Start': shutdown_start,
+        'End': shutdown_start + pd.to_timedelta(shutdown_df['Duration_Days'] - 1, unit='D'),
+        'Platform': shutdown_df['Platform'],
+    })], ignore_index=True)
+    
+    fig_gantt = px.timeline(gantt_df, x_start="Start", x_end="End", y="Task", 
                            color="Platform", title="Work Schedule Timeline")
     fig_gantt.update_yaxes(autorange="reversed")
     st.plotly_chart(fig_gantt, use_container_width=True)
@@ -285,15 +370,6 @@ elif page == "Scheduling & Planning":
     # Shutdown maintenance plan
     st.subheader("🔧 Shutdown Maintenance Forward Plan")
     
-    shutdown_data = {
-        'Platform': ['Platform_Alpha', 'Platform_Beta', 'Platform_Gamma'],
-        'Next_Shutdown': ['2025-04-15', '2025-06-20', '2025-08-10'],
-        'Duration_Days': [5, 7, 4],
-        'Planned_Work': ['Compressor overhaul, Valve testing', 'Turbine maintenance, Safety systems', 'Electrical upgrades, Piping'],
-        'Status': ['Planned', 'Scheduled', 'Planning']
-    }
-    
-    shutdown_df = pd.DataFrame(shutdown_data)
     st.dataframe(shutdown_df, use_container_width=True)
     
     # Work windows
@@ -418,6 +494,77 @@ elif page == "Logistics":
     # Detailed bed space table
     st.dataframe(bed_space_df, use_container_width=True)
     
+    # Field map
+    st.subheader("🗺️ Field Map")
+    
+    well_index, well_clusters = build_spatial_index(points_digest(wells_df, 'Well_ID'), wells_df, 'Well_ID')
+    platform_index, _ = build_spatial_index(points_digest(platforms_df, 'Platform'), platforms_df, 'Platform')
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        map_center = st.selectbox("Center Map On", ["Field Overview"] + platforms_df['Platform'].tolist())
+    with col2:
+        map_zoom = st.slider("Zoom Level", min_value=4, max_value=14, value=9)
+    
+    if map_center == "Field Overview":
+        center_lat, center_lon = platforms_df['Latitude'].mean(), platforms_df['Longitude'].mean()
+    else:
+        center = platforms_df[platforms_df['Platform'] == map_center].iloc[0]
+        center_lat, center_lon = center['Latitude'], center['Longitude']
+    
+    # Only clusters inside the viewport are sent to the browser; the box is sized
+    # for a wide-screen map so stretching to the container width shows no gaps
+    map_clusters = well_clusters.clusters(
+        map_zoom, viewport_bbox(center_lat, center_lon, map_zoom, width_px=2400, height_px=1000))
+    
+    fig_map = go.Figure()
+    fig_map.add_trace(go.Scattermapbox(
+        lat=map_clusters['Latitude'], lon=map_clusters['Longitude'], mode='markers',
+        marker=dict(size=np.clip(8 + 4 * np.log2(map_clusters['Count']), 8, 40), color='#4682B4', opacity=0.8),
+        text=map_clusters['Label'], hoverinfo='text', name='Wells'
+    ))
+    fig_map.add_trace(go.Scattermapbox(
+        lat=platforms_df['Latitude'], lon=platforms_df['Longitude'], mode='markers+text',
+        marker=dict(size=16, color='#FF6347'), text=platforms_df['Platform'], textposition='top right',
+        hoverinfo='text', name='Platforms'
+    ))
+    fig_map.update_layout(
+        mapbox=dict(style='open-street-map', center=dict(lat=center_lat, lon=center_lon), zoom=map_zoom),
+        margin=dict(l=0, r=0, t=0, b=0), height=500,
+        # Pan/zoom happen through the controls above so clusters always match the view
+        dragmode=False
+    )
+    st.plotly_chart(fig_map, use_container_width=True, config={'scrollZoom': False, 'doubleClick': False})
+    st.caption(f"{len(map_clusters):,} markers for {int(map_clusters['Count'].sum()):,} wells in view. "
+               "Use Center Map On and Zoom Level to move the map; the zoom level sets the clustering.")
+    
+    # Route planning queries
+    st.subheader("📍 Route Planning")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Wells Within Range of Platform:**")
+        range_platform = st.selectbox("Platform", platforms_df['Platform'].tolist(), key="range_platform")
+        range_km = st.slider("Radius (km)", min_value=1, max_value=100, value=25)
+        platform = platforms_df[platforms_df['Platform'] == range_platform].iloc[0]
+        positions, distances = well_index.within_radius(platform['Latitude'], platform['Longitude'], range_km)
+        wells_in_range = wells_df.iloc[positions][['Well_ID', 'Platform', 'Status', 'Priority']].assign(
+            Distance_km=distances.round(1))
+        st.write(f"{len(wells_in_range)} wells within {range_km} km of {range_platform}")
+        st.dataframe(wells_in_range, use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.write("**Nearest Platform to Well:**")
+        located_wells = wells_df.dropna(subset=['Latitude', 'Longitude'])
+        nearest_well = st.selectbox("Well", located_wells['Well_ID'].tolist(), key="nearest_well")
+        if nearest_well:
+            well = located_wells[located_wells['Well_ID'] == nearest_well].iloc[0]
+            positions, distances = platform_index.nearest(well['Latitude'], well['Longitude'], k=len(platforms_df))
+            nearest_df = platforms_df.iloc[positions][['Platform']].assign(Distance_km=distances.round(1))
+            st.metric("Nearest Platform", nearest_df['Platform'].iloc[0], delta=f"{distances[0]:.1f} km",
+                      delta_color="off")
+            st.dataframe(nearest_df, use_container_width=True, hide_index=True)
+    
     # Marine weather conditions
     st.subheader("🌊 Marine Conditions")
     
@@ -513,28 +660,17 @@ elif page == "Well History":
         # Historical interventions
         st.subheader("📋 Intervention History")
         
-        # Sample historical data
-        history_data = {
-            'Date': ['2024-12-10', '2024-08-15', '2024-04-20', '2023-12-05', '2023-08-10'],
-            'Intervention_Type': ['Valve Testing', 'Coiled Tubing Cleanout', 'Wireline Logging', 'Workover', 'Completion'],
-            'Duration_Hours': [8, 24, 12, 72, 120],
-            'Personnel': [4, 8, 3, 12, 15],
-            'Cost_USD': [25000, 150000, 35000, 500000, 800000],
-            'Result': ['Swab valve failed', 'Successful', 'Data acquired', 'New completion installed', 'Well completed'],
-            'Next_Action': ['Valve replacement', 'Monitor production', 'Analyze data', 'Production optimization', 'Regular maintenance']
-        }
-        
-        history_df = pd.DataFrame(history_data)
+        history_df = sample_history(selected_well)
         st.dataframe(history_df, use_container_width=True)
         
         # Production history chart
         st.subheader("📈 Production History")
         
         # Sample production data
-        dates = pd.date_range(start='2023-01-01', end='2025-01-01', freq='M')
-        production = np.random.normal(1000, 100, len(dates))  # Sample production data
+        production_df = sample_production(selected_well)
         
-        fig_prod = px.line(x=dates, y=production, title=f"Production History - {selected_well}",
+        fig_prod = px.line(x=production_df['Date'], y=production_df['Production_bbl_day'],
+                          title=f"Production History - {selected_well}",
                           labels={'x': 'Date', 'y': 'Production (bbl/day)'})
         st.plotly_chart(fig_prod, use_container_width=True)
 
@@ -627,31 +763,21 @@ elif page == "Integrity Management":
     st.subheader("🗓️ Upcoming Preventive Maintenance")
     
     # Sort wells by next PM due date
-    wells_pm = wells_df.copy()
-    wells_pm['Next_PM_Due'] = pd.to_datetime(wells_pm['Next_PM_Due'])
-    wells_pm = wells_pm.sort_values('Next_PM_Due')
-    
-    pm_data = []
-    for idx, well in wells_pm.iterrows():
-        days_until_pm = (well['Next_PM_Due'] - pd.Timestamp.now()).days
-        status = "Overdue" if days_until_pm < 0 else "Due Soon" if days_until_pm < 30 else "Scheduled"
-        
-        pm_data.append({
-            'Well_ID': well['Well_ID'],
-            'Platform': well['Platform'],
-            'Next_PM_Due': well['Next_PM_Due'].strftime('%Y-%m-%d'),
-            'Days_Until_PM': days_until_pm,
-            'Status': status,
-            'PM_Type': 'Valve Testing & Inspection'
-        })
-    
-    pm_df = pd.DataFrame(pm_data)
+    pm_status_col, days_until_pm = pm_statuses(wells_df['Next_PM_Due'].to_numpy())
+    pm_df = pd.DataFrame({
+        'Well_ID': wells_df['Well_ID'].to_numpy(),
+        'Platform': wells_df['Platform'].to_numpy(),
+        'Next_PM_Due': wells_df['Next_PM_Due'].astype(str).to_numpy(),
+        'Days_Until_PM': days_until_pm.astype('Int64').to_numpy(),
+        'Status': pm_status_col.to_numpy(),
+        'PM_Type': 'Valve Testing & Inspection'
+    }).sort_values('Days_Until_PM', na_position='last')
     
     # Color code PM status
     def color_pm_status(val):
         if val == 'Overdue':
             return 'background-color: #f8d7da; color: #721c24'
-        elif val == 'Due Soon':
+        elif val in ('Due Soon', 'Unknown'):
             return 'background-color: #fff3cd; color: #856404'
         else:
             return 'background-color: #d4edda; color: #155724'
@@ -659,6 +785,154 @@ elif page == "Integrity Management":
     styled_pm_df = pm_df.style.applymap(color_pm_status, subset=['Status'])
     st.dataframe(styled_pm_df, use_container_width=True)
 
+elif page == "Scenario Planning":
+    st.header("🔀 What-If Scenario Planning")
+    
+    # Scenarios fork the baseline plan held in the session, so unchanged data and
+    # the KPIs computed from it are shared between scenarios across reruns
+    reset_scenarios = st.button("Reset Scenarios")
+    if reset_scenarios or 'scenario_baseline' not in st.session_state:
+        st.session_state['scenario_baseline'] = Plan({
+            'wells': wells_df, 'tools': tools_df, 'bed_space': bed_space_df,
+            'schedule': schedule_df, 'shutdowns': shutdown_df
+        })
+        st.session_state['scenarios'] = []
+    baseline = st.session_state['scenario_baseline']
+    scenarios = st.session_state['scenarios']
+    plans = [baseline] + scenarios
+    
+    # Create scenario
+    st.subheader("➕ Create Scenario")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        scenario_name = st.text_input("Scenario Name", value=f"Scenario {len(scenarios) + 1}")
+        parent_name = st.selectbox("Fork From", [plan.name for plan in plans])
+        change_type = st.selectbox("Change", ["Slip Platform Shutdown", "Lose Tool Units", "Defer Platform PMs"])
+    with col2:
+        if change_type == "Lose Tool Units":
+            change_target = st.selectbox("Tool", tools_df['Tool_Equipment'].astype(str).tolist())
+            change_amount = st.number_input("Units Lost", min_value=1, max_value=10, value=1)
+        else:
+            change_target = st.selectbox("Platform", shutdown_df['Platform'].astype(str).tolist())
+            change_amount = st.number_input("Days", min_value=-90, max_value=180, value=14)
+    
+    if st.button("Add Scenario"):
+        parent = next(plan for plan in plans if plan.name == parent_name)
+        if any(plan.name == scenario_name for plan in plans):
+            st.error(f"A scenario named '{scenario_name}' already exists")
+        else:
+            try:
+                scenario = parent.fork(scenario_name)
+                if change_type == "Slip Platform Shutdown":
+                    scenario = scenario.slip_shutdown(change_target, int(change_amount))
+                elif change_type == "Lose Tool Units":
+                    scenario = scenario.remove_tool_units(change_target, int(change_amount))
+                else:
+                    scenario = scenario.defer_pm(change_target, int(change_amount))
+            except ValueError as exc:
+                st.error(str(exc))
+            else:
+                scenarios.append(scenario)
+                plans.append(scenario)
+                st.success(f"Scenario '{scenario_name}' added")
+    
+    # Scenario comparison
+    st.subheader("📊 Scenario Comparison")
+    
+    eval_start = datetime.datetime.now()
+    comparison = compare(plans)
+    kpis = {plan.name: evaluate(plan) for plan in plans}
+    eval_ms = (datetime.datetime.now() - eval_start).total_seconds() * 1000
+    
+    st.dataframe(comparison.astype(str), use_container_width=True)
+    st.caption(f"Evaluated {len(plans)} scenarios in {eval_ms:.0f} ms")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        bed_compare = pd.concat(
+            {name: result['beds']['Peak_Utilisation_%'] for name, result in kpis.items()}, names=['Scenario']
+        ).reset_index()
+        fig_beds = px.bar(bed_compare, x='Platform', y='Peak_Utilisation_%', color='Scenario', barmode='group',
+                          title="Peak Bed Utilisation by Platform")
+        fig_beds.add_hline(y=100, line_dash='dash', line_color='#FF6347')
+        st.plotly_chart(fig_beds, use_container_width=True)
+    
+    with col2:
+        tool_compare = pd.concat(
+            {name: result['tools']['Conflict_Days'] for name, result in kpis.items()}, names=['Scenario']
+        ).reset_index()
+        fig_tools = px.bar(tool_compare, x='Tool_Equipment', y='Conflict_Days', color='Scenario', barmode='group',
+                           title="Tool Conflict Days (Demand Above Available Units)")
+        fig_tools.update_xaxes(tickangle=45)
+        st.plotly_chart(fig_tools, use_container_width=True)
+    
+    # Scenario details
+    for scenario in scenarios:
+        with st.expander(f"🔀 {scenario.name}"):
+            st.write("**Changes from Baseline:**")
+            for change in scenario.changes:
+                st.write(f"• {change}")
+            st.write("**PM Status by Platform:**")
+            st.dataframe(kpis[scenario.name]['pm_status'], use_container_width=True)
+            if st.button(f"Remove Scenario - {scenario.name}", key=f"remove_{scenario.name}"):
+                scenarios.remove(scenario)
+                st.rerun()
+
+elif page == "Data Import":
+    st.header("📥 Data Import")
+    
+    st.write("Import well, valve test and PM data or tools data from maintenance system exports (CSV or Excel). "
+             "Rows are matched on Well_ID / Tool_Equipment; existing rows are updated and new ones added. "
+             "Columns missing from the file are left unchanged on existing rows.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        dataset = st.selectbox("Dataset", ["Wells & Valve Tests", "Tools & Equipment"])
+    with col2:
+        uploaded_file = st.file_uploader("Export file", type=['csv', 'xlsx'])
+    dayfirst = st.checkbox("Dates are day-first (DD/MM/YYYY)", value=False,
+                           help="Controls how 01/02/2025 is read; ISO dates (YYYY-MM-DD) are unaffected")
+    
+    dataset_key = 'wells' if dataset == "Wells & Valve Tests" else 'tools'
+    current_df = wells_df if dataset_key == 'wells' else tools_df
+    
+    if uploaded_file is not None and st.button("Run Import"):
+        rows_status = st.empty()
+        try:
+            result = import_file(uploaded_file, dataset_key, existing=current_df, file_name=uploaded_file.name,
+                                 progress=lambda rows_read: rows_status.write(f"{rows_read:,} rows read"),
+                                 dayfirst=dayfirst)
+        except (ValueError, zipfile.BadZipFile) as exc:
+            st.error(f"Import failed: {exc}")
+        else:
+            st.session_state[f'{dataset_key}_df'] = result.data
+            # Scenarios were forked from the old data; rebuild them on the next visit
+            st.session_state.pop('scenario_baseline', None)
+            st.session_state.pop('scenarios', None)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Rows Read", f"{result.rows_read:,}")
+            with col2:
+                st.metric("Rows Accepted", f"{result.accepted_count:,}")
+            with col3:
+                st.metric("Rows Rejected", f"{result.rejected_count:,}")
+            
+            if result.rejected_count:
+                st.subheader("⚠️ Rejected Rows")
+                if result.rejected_count > len(result.reject_samples):
+                    st.warning(f"Showing first {len(result.reject_samples):,} of {result.rejected_count:,} rejected rows")
+                st.dataframe(result.reject_samples, use_container_width=True)
+                st.download_button("Download Rejected Rows", result.reject_samples.to_csv(index=False),
+                                   file_name=f"rejected_{dataset_key}.csv", mime='text/csv')
+            st.success(f"{dataset} now holds {len(result.data):,} records")
+    
+    if f'{dataset_key}_df' in st.session_state and st.button("Revert to Sample Data"):
+        del st.session_state[f'{dataset_key}_df']
+        st.session_state.pop('scenario_baseline', None)
+        st.session_state.pop('scenarios', None)
+        st.info("Sample data restored")
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,191 @@
+"""Spatial index and level-of-detail clustering for the platform/well map.
+
+Points are bucketed into a fixed lat/lon grid and sorted by cell, so a
+viewport or radius query only touches the cells it overlaps (one binary search
+per grid row) before an exact distance check. Map clusters are built per zoom
+level by snapping points to a zoom-dependent grid and cached, so panning a
+50k-well field only re-filters precomputed clusters.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+# Default grid cell of ~0.1 deg (~11 km), roughly the spacing of an offshore field
+DEFAULT_CELL_DEG = 0.1
+
+# Web map tiles are 256px; points closer than CLUSTER_PX on screen are merged
+TILE_PX = 256
+CLUSTER_PX = 60
+# From this zoom on, wells are shown individually
+MAX_CLUSTER_ZOOM = 13
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; accepts scalars or numpy arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def radius_bbox(lat, lon, radius_km):
+    """Bounding box (south, west, north, east) enclosing a radius around a point."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return max(-90.0, lat - dlat), lon - dlon, min(90.0, lat + dlat), lon + dlon
+
+
+def viewport_bbox(center_lat, center_lon, zoom, width_px=1000, height_px=500):
+    """Approximate (south, west, north, east) visible on a web map of the given size."""
+    deg_per_px = 360.0 / (TILE_PX * 2 ** zoom)
+    half_w = deg_per_px * width_px / 2
+    # Mercator stretches latitude; scale by cos(lat) for the visible height
+    half_h = deg_per_px * height_px / 2 * math.cos(math.radians(center_lat))
+    return (max(-90.0, center_lat - half_h), center_lon - half_w,
+            min(90.0, center_lat + half_h), center_lon + half_w)
+
+
+class GridIndex:
+    """Grid spatial index over point coordinates.
+
+    Query results are positions into the arrays the index was built from, so
+    callers can ``.iloc`` straight back into their DataFrame. Points with
+    missing coordinates are skipped.
+    """
+
+    def __init__(self, lats, lons, cell_deg=DEFAULT_CELL_DEG):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        positions = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+        self.cell_deg = cell_deg
+        self.n_cols = int(math.ceil(360.0 / cell_deg))
+        self.n_rows = int(math.ceil(180.0 / cell_deg))
+
+        keys = self._cell_key(lats[positions], lons[positions])
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._positions = positions[order]
+        self._lats = lats[positions][order]
+        self._lons = lons[positions][order]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _row_col(self, lats, lons):
+        rows = np.clip(np.floor((np.asarray(lats) + 90.0) / self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+        cols = np.floor((((np.asarray(lons) + 180.0) % 360.0)) / self.cell_deg).astype(np.int64) % self.n_cols
+        return rows, cols
+
+    def _cell_key(self, lats, lons):
+        rows, cols = self._row_col(lats, lons)
+        return rows * self.n_cols + cols
+
+    def _candidates(self, south, west, north, east):
+        # Longitude ranges crossing the antimeridian are split in two
+        if east - west >= 360.0:
+            west, east = -180.0, 180.0 - 1e-9
+        west = (west + 180.0) % 360.0 - 180.0
+        east = (east + 180.0) % 360.0 - 180.0
+        if west > east:
+            return np.concatenate([self._candidates(south, west, north, 180.0 - 1e-9),
+                                   self._candidates(south, -180.0, north, east)])
+
+        (row_lo, row_hi), (col_lo, col_hi) = self._row_col([south, north], [west, east])
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        # Each grid row is a contiguous key range in the sorted key array
+        starts = np.searchsorted(self._keys, rows * self.n_cols + col_lo, side='left')
+        ends = np.searchsorted(self._keys, rows * self.n_cols + col_hi, side='right')
+        spans = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+
+    def within_bbox(self, south, west, north, east):
+        """Positions of points inside a (south, west, north, east) box."""
+        idx = self._candidates(south, west, north, east)
+        lats, lons = self._lats[idx], self._lons[idx]
+        inside = (lats >= south) & (lats <= north)
+        if east - west < 360.0:
+            west_n = (west + 180.0) % 360.0 - 180.0
+            east_n = (east + 180.0) % 360.0 - 180.0
+            if west_n <= east_n:
+                inside &= (lons >= west_n) & (lons <= east_n)
+            else:
+                inside &= (lons >= west_n) | (lons <= east_n)
+        return self._positions[idx[inside]]
+
+    def within_radius(self, lat, lon, radius_km):
+        """(positions, distances_km) of points within ``radius_km``, nearest first."""
+        idx = self._candidates(*radius_bbox(lat, lon, radius_km))
+        distances = haversine_km(lat, lon, self._lats[idx], self._lons[idx])
+        inside = distances <= radius_km
+        idx, distances = idx[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return self._positions[idx[order]], distances[order]
+
+    def nearest(self, lat, lon, k=1):
+        """(positions, distances_km) of the ``k`` nearest points."""
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Grow the search radius until it holds k points; everything closer
+        # than that radius has then been considered.
+        radius_km = self.cell_deg * KM_PER_DEG_LAT
+        while True:
+            positions, distances = self.within_radius(lat, lon, radius_km)
+            if len(positions) >= k or radius_km >= math.pi * EARTH_RADIUS_KM:
+                return positions[:k], distances[:k]
+            radius_km *= 2
+
+
+def cluster_cell_deg(zoom):
+    """Grid cell size in degrees that merges points closer than CLUSTER_PX at ``zoom``."""
+    return 360.0 / (TILE_PX * 2 ** zoom) * CLUSTER_PX
+
+
+class ClusterLevels:
+    """Per-zoom-level clusters of a point set, computed on first use and cached."""
+
+    def __init__(self, lats, lons, labels):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        self._lats = lats[valid]
+        self._lons = lons[valid]
+        self._labels = np.asarray(labels, dtype=object)[valid]
+        self._levels = {}
+
+    def level(self, zoom):
+        """DataFrame of clusters (Latitude, Longitude, Count, Label) for a zoom level."""
+        zoom = int(min(max(zoom, 0), MAX_CLUSTER_ZOOM))
+        if zoom not in self._levels:
+            self._levels[zoom] = self._build(zoom)
+        return self._levels[zoom]
+
+    def _build(self, zoom):
+        if zoom >= MAX_CLUSTER_ZOOM:
+            return pd.DataFrame({'Latitude': self._lats, 'Longitude': self._lons,
+                                 'Count': np.ones(len(self._lats), dtype=np.int64), 'Label': self._labels})
+        cell = cluster_cell_deg(zoom)
+        rows = np.floor((self._lats + 90.0) / cell).astype(np.int64)
+        cols = np.floor((self._lons + 180.0) / cell).astype(np.int64)
+        keys = rows * (int(360.0 / cell) + 2) + cols
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        # Clusters sit at the centroid of their members, not the cell centre
+        lat_mean = np.bincount(inverse, weights=self._lats) / counts
+        lon_mean = np.bincount(inverse, weights=self._lons) / counts
+        labels = np.where(counts == 1, self._labels[first], np.char.add(counts.astype(str), ' wells'))
+        return pd.DataFrame({'Latitude': lat_mean, 'Longitude': lon_mean, 'Count': counts, 'Label': labels})
+
+    def clusters(self, zoom, bbox=None):
+        """Clusters for ``zoom``, limited to a (south, west, north, east) viewport if given."""
+        clusters = self.level(zoom)
+        if bbox is None:
+            return clusters
+        south, west, north, east = bbox
+        mask = clusters['Latitude'].between(south, north) & clusters['Longitude'].between(west, east)
+        return clusters[mask]
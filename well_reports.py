@@ -0,0 +1,328 @@
+"""Per-well integrity and intervention-history reports.
+
+Reports are written as standalone HTML (print-to-PDF ready) plus CSV extracts
+of the intervention history and production series. Batches are fanned out over
+a process pool so a fleet-wide run does not block the Streamlit UI thread.
+
+Batch mode from the command line:
+
+    python well_reports.py wells.csv --out reports --workers 8
+"""
+
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+VALVE_COLUMNS = ['Master_Valve', 'Swab_Valve', 'Wing_Valve']
+
+HISTORY_COLUMNS = ['Date', 'Intervention_Type', 'Duration_Hours', 'Personnel',
+                   'Cost_USD', 'Result', 'Next_Action']
+
+# Sample intervention history, shared by every well until real records are imported
+SAMPLE_HISTORY = {
+    'Date': ['2024-12-10', '2024-08-15', '2024-04-20', '2023-12-05', '2023-08-10'],
+    'Intervention_Type': ['Valve Testing', 'Coiled Tubing Cleanout', 'Wireline Logging', 'Workover', 'Completion'],
+    'Duration_Hours': [8, 24, 12, 72, 120],
+    'Personnel': [4, 8, 3, 12, 15],
+    'Cost_USD': [25000, 150000, 35000, 500000, 800000],
+    'Result': ['Swab valve failed', 'Successful', 'Data acquired', 'New completion installed', 'Well completed'],
+    'Next_Action': ['Valve replacement', 'Monitor production', 'Analyze data', 'Production optimization', 'Regular maintenance']
+}
+
+# PMs due within this many days are flagged Due Soon
+DUE_SOON_DAYS = 30
+
+# Wells are grouped into batches per worker task so that process start-up and
+# pickling overhead is paid once per batch rather than once per report.
+DEFAULT_BATCH_SIZE = 64
+
+PAGE_STYLE = """
+body { font-family: Arial, sans-serif; color: #1f2d3d; margin: 2rem; }
+h1 { color: #1f4e79; border-bottom: 2px solid #1f4e79; padding-bottom: 0.3rem; }
+h2 { color: #1f4e79; margin-top: 1.5rem; }
+table { border-collapse: collapse; width: 100%; margin: 0.5rem 0; }
+th, td { border: 1px solid #ccd6e0; padding: 4px 8px; text-align: left; font-size: 0.9rem; }
+th { background-color: #f0f4f8; }
+.status-ok { background-color: #d4edda; color: #155724; font-weight: bold; }
+.status-warning { background-color: #fff3cd; color: #856404; font-weight: bold; }
+.status-critical { background-color: #f8d7da; color: #721c24; font-weight: bold; }
+@media print { body { margin: 0; } h2 { page-break-after: avoid; } }
+"""
+
+
+def _well_seed(well_id):
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(str(well_id).encode('utf-8'))
+
+
+def sample_history(well_id):
+    """Return the sample intervention history for a well."""
+    del well_id  # every well shares the sample history for now
+    return pd.DataFrame(SAMPLE_HISTORY)
+
+
+def sample_production(well_id, start='2023-01-01', end='2025-01-01'):
+    """Return a monthly production series, reproducible per well."""
+    dates = pd.date_range(start=start, end=end, freq=pd.offsets.MonthEnd())
+    rng = np.random.default_rng(_well_seed(well_id))
+    production = rng.normal(1000, 100, len(dates))
+    return pd.DataFrame({'Date': dates, 'Production_bbl_day': production.round(1)})
+
+
+def overall_valve_status(well):
+    """'Pass' only when every tested valve passed."""
+    return 'Pass' if all(well[col] == 'Pass' for col in VALVE_COLUMNS) else 'Fail'
+
+
+def pm_statuses(next_pm_due, today=None):
+    """Vectorised PM classification: Overdue, Due Soon, Scheduled or Unknown (no valid date).
+
+    This is the single definition of the PM status rule, shared by the reports,
+    the Integrity Management page and the scenario KPIs. Returns
+    ``(status, days_until_pm)`` Series; days are NaN where the date is unknown.
+    """
+    due = pd.Series(next_pm_due)
+    if not pd.api.types.is_datetime64_any_dtype(due):
+        due = pd.to_datetime(due.astype(object).where(due.notna() & (due.astype(str) != ''), None),
+                             errors='coerce')
+    days_until_pm = (due - pd.Timestamp(today or date.today()).normalize()).dt.days
+    status = np.select([days_until_pm < 0, days_until_pm < DUE_SOON_DAYS], ['Overdue', 'Due Soon'], 'Scheduled')
+    status = pd.Series(status, index=due.index).where(days_until_pm.notna(), 'Unknown')
+    return status, days_until_pm
+
+
+def pm_status(next_pm_due, today=None):
+    """Scalar form of :func:`pm_statuses`; days is None when the date is unknown."""
+    status, days_until_pm = pm_statuses([next_pm_due], today)
+    days = days_until_pm.iloc[0]
+    return status.iloc[0], None if pd.isna(days) else int(days)
+
+
+def _status_class(value):
+    if value in ('Pass', 'Scheduled', 'Low'):
+        return 'status-ok'
+    if value in ('Fail', 'Overdue', 'Critical'):
+        return 'status-critical'
+    return 'status-warning'
+
+
+def _table(rows, header):
+    cells = ''.join(f'<th>{html.escape(str(h))}</th>' for h in header)
+    body = []
+    for row in rows:
+        body.append('<tr>' + ''.join(f'<td>{html.escape(str(v))}</td>' for v in row) + '</tr>')
+    return f'<table><thead><tr>{cells}</tr></thead><tbody>{"".join(body)}</tbody></table>'
+
+
+def render_well_report(well, history_df, production_df, generated_at=None):
+    """Render a single well's integrity and intervention-history report as HTML."""
+    generated_at = generated_at or datetime.now().strftime('%Y-%m-%d %H:%M')
+    well_id = html.escape(str(well['Well_ID']))
+    status, days_until_pm = pm_status(well['Next_PM_Due'])
+    overall = overall_valve_status(well)
+
+    summary = _table([
+        ('Platform', well['Platform']),
+        ('Well Type', well['Well_Type']),
+        ('Status', well['Status']),
+        ('Priority', well['Priority']),
+        ('Last Intervention', well['Last_Intervention']),
+        ('Integrity Issues', well['Integrity_Issues']),
+    ], ('Field', 'Value'))
+
+    valve_rows = ''.join(
+        f'<tr><td>{col.replace("_", " ")}</td>'
+        f'<td class="{_status_class(well[col])}">{html.escape(str(well[col]))}</td></tr>'
+        for col in VALVE_COLUMNS
+    )
+    valves = (f'<table><thead><tr><th>Valve</th><th>Result</th></tr></thead><tbody>{valve_rows}'
+              f'<tr><td><strong>Overall</strong></td><td class="{_status_class(overall)}">{overall}</td></tr>'
+              f'</tbody></table>')
+
+    if days_until_pm is None:
+        pm = f'<p>Next PM due date not recorded - <span class="{_status_class(status)}">{status}</span></p>'
+    else:
+        pm = (f'<p>Next PM due <strong>{html.escape(str(well["Next_PM_Due"]))}</strong> '
+              f'({days_until_pm} days) - <span class="{_status_class(status)}">{status}</span></p>')
+
+    history = _table(history_df[HISTORY_COLUMNS].itertuples(index=False), HISTORY_COLUMNS)
+
+    if len(production_df):
+        values = production_df['Production_bbl_day']
+        production = (f'<p>{len(values)} monthly readings from '
+                      f'{production_df["Date"].iloc[0]:%Y-%m-%d} to {production_df["Date"].iloc[-1]:%Y-%m-%d}: '
+                      f'mean {values.mean():.1f} bbl/day, min {values.min():.1f}, max {values.max():.1f}, '
+                      f'latest {values.iloc[-1]:.1f}.</p>')
+    else:
+        production = '<p>No production data available.</p>'
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Well Report - {well_id}</title>
+<style>{PAGE_STYLE}</style>
+</head>
+<body>
+<h1>Well Integrity &amp; Intervention Report - {well_id}</h1>
+<p>Generated {generated_at}</p>
+<h2>Well Summary</h2>
+{summary}
+<h2>Valve Test Results</h2>
+{valves}
+<h2>Preventive Maintenance</h2>
+{pm}
+<h2>Intervention History</h2>
+{history}
+<h2>Production</h2>
+{production}
+</body>
+</html>
+"""
+
+
+def report_file_stem(well_id):
+    """File-system safe name for a well's report files (e.g. 15/9-F-14 -> 15_9-F-14)."""
+    stem = re.sub(r'[^\w.-]', '_', str(well_id)).lstrip('.')
+    return stem or '_'
+
+
+def assign_file_stems(well_ids):
+    """File stems for a run, unique even on case-insensitive file systems.
+
+    IDs whose sanitised stems clash (15/9-F-14 vs 15_9-F-14, or A1 vs a1) get a
+    crc32 suffix of the raw ID. A stem that still clashes (the same Well_ID
+    listed twice) is returned as None so the caller can fail that well.
+    """
+    stems = [report_file_stem(well_id) for well_id in well_ids]
+    clashes = Counter(stem.lower() for stem in stems)
+    stems = [f"{stem}-{zlib.crc32(str(well_id).encode('utf-8')):08x}" if clashes[stem.lower()] > 1 else stem
+             for stem, well_id in zip(stems, well_ids)]
+    seen = set()
+    unique = []
+    for stem in stems:
+        unique.append(None if stem.lower() in seen else stem)
+        seen.add(stem.lower())
+    return unique
+
+
+def write_well_report(well, out_dir, history_df=None, production_df=None, generated_at=None, file_stem=None):
+    """Write the HTML report and CSV extracts for one well, returning the HTML path."""
+    well_id = str(well['Well_ID'])
+    if history_df is None:
+        history_df = sample_history(well_id)
+    if production_df is None:
+        production_df = sample_production(well_id)
+
+    base = os.path.join(out_dir, file_stem or report_file_stem(well_id))
+    report_path = f'{base}.html'
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(render_well_report(well, history_df, production_df, generated_at))
+    history_df.to_csv(f'{base}_history.csv', index=False)
+    production_df.to_csv(f'{base}_production.csv', index=False, date_format='%Y-%m-%d')
+    return report_path
+
+
+def _write_batch(wells, out_dir, generated_at):
+    # Worker entry point; must stay at module level so it can be pickled.
+    # One bad well is recorded and skipped rather than failing the whole batch.
+    paths, failures = [], []
+    for well, file_stem in wells:
+        try:
+            paths.append(write_well_report(well, out_dir, generated_at=generated_at, file_stem=file_stem))
+        except Exception as exc:  # pylint: disable=broad-except
+            failures.append((str(well.get('Well_ID')), f"{type(exc).__name__}: {exc}"))
+    return paths, failures
+
+
+def _write_fleet_summary(wells_df, out_dir):
+    path = os.path.join(out_dir, 'fleet_summary.csv')
+    status, _ = pm_statuses(wells_df['Next_PM_Due'].to_numpy())
+    passed = (wells_df[VALVE_COLUMNS].astype(str) == 'Pass').all(axis=1)
+    summary = wells_df[['Well_ID', 'Platform', 'Priority'] + VALVE_COLUMNS].assign(
+        Overall_Status=np.where(passed, 'Pass', 'Fail'),
+        Next_PM_Due=wells_df['Next_PM_Due'].to_numpy(),
+        PM_Status=status.to_numpy(),
+    )
+    summary.to_csv(path, index=False)
+    return path
+
+
+def generate_reports(wells_df, out_dir, workers=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Generate reports for every well in ``wells_df`` over a process pool.
+
+    ``progress`` is called as ``progress(done, total, failed)`` from the calling
+    thread after each completed batch, where ``done`` includes failed wells.
+    Returns ``(paths, failures)``: the HTML report paths and a list of
+    ``(Well_ID, error)`` for wells whose report could not be written. A
+    ``fleet_summary.csv`` is written alongside the per-well reports.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    wells = wells_df.to_dict('records')
+    total = len(wells)
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M')
+    stems = assign_file_stems([well['Well_ID'] for well in wells])
+
+    paths = []
+    failures = [(str(well['Well_ID']), "Duplicate Well_ID; report not written")
+                for well, stem in zip(wells, stems) if stem is None]
+    tasks = [(well, stem) for well, stem in zip(wells, stems) if stem is not None]
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+
+    def collect(batch_paths, batch_failures):
+        paths.extend(batch_paths)
+        failures.extend(batch_failures)
+        if progress:
+            progress(len(paths) + len(failures), total, len(failures))
+
+    if workers == 1 or len(batches) <= 1:
+        # Not worth spinning up a pool for a single well or a single batch
+        for batch in batches:
+            collect(*_write_batch(batch, out_dir, generated_at))
+    else:
+        # spawn, not fork: forking the multithreaded Streamlit server can deadlock
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {executor.submit(_write_batch, batch, out_dir, generated_at): batch for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    collect(*future.result())
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Worker died (e.g. out of memory); fail its wells, keep the rest
+                    collect([], [(str(well.get('Well_ID')), f"{type(exc).__name__}: {exc}")
+                                 for well, _ in futures[future]])
+
+    _write_fleet_summary(wells_df, out_dir)
+    return sorted(paths), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate per-well integrity and intervention reports")
+    parser.add_argument('wells_csv', help="CSV with the Wells Management columns (Well_ID, Platform, ...)")
+    parser.add_argument('--out', default='reports', help="Output directory (default: reports)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Wells per worker task")
+    args = parser.parse_args()
+
+    wells_df = pd.read_csv(args.wells_csv, dtype=str)
+
+    def report_progress(done, total, failed):
+        print(f"\r{done}/{total} wells processed, {failed} failed", end='', flush=True)
+
+    paths, failures = generate_reports(wells_df, args.out, workers=args.workers,
+                                       batch_size=args.batch_size, progress=report_progress)
+    print(f"\n✅ {len(paths)} reports written to {args.out}")
+    for well_id, error in failures:
+        print(f"⚠️ {well_id}: {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""What-if scenarios over the intervention plan.
+
+A ``Plan`` holds the wells, tools, bed space, schedule and shutdown frames.
+Forking a plan copies only the dict of frame references, and each change
+replaces just the frame it touches, so scenarios share every unchanged frame
+with their parent. KPIs are memoised on the identity of the frames they read:
+slipping a shutdown recomputes bed and PM-at-shutdown figures but reuses the
+PM status and tool utilisation already computed for the parent plan.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from well_reports import pm_statuses
+
+FRAMES = ('wells', 'tools', 'bed_space', 'schedule', 'shutdowns')
+
+# Memoised KPI results; entries hold their input frames so ids cannot be reused.
+# Shared by every Streamlit session (one thread each), hence the lock.
+MAX_CACHED_KPIS = 256
+_KPI_CACHE = OrderedDict()
+_KPI_CACHE_LOCK = threading.Lock()
+
+
+class Plan:
+    """Immutable snapshot of the plan; changes return a new Plan sharing unchanged frames."""
+
+    def __init__(self, frames, name='Baseline', changes=(), as_of=None):
+        missing = [f for f in FRAMES if f not in frames]
+        if missing:
+            raise ValueError(f"Plan is missing frames: {', '.join(missing)}")
+        self._frames = dict(frames)
+        self.name = name
+        self.changes = tuple(changes)
+        self.as_of = pd.Timestamp(as_of or date.today()).normalize()
+
+    def __getitem__(self, frame):
+        return self._frames[frame]
+
+    def fork(self, name):
+        """New plan with the same frames (shared, not copied)."""
+        return Plan(self._frames, name, self.changes, self.as_of)
+
+    def _replace(self, frame, df, change):
+        frames = dict(self._frames)
+        frames[frame] = df
+        return Plan(frames, self.name, self.changes + (change,), self.as_of)
+
+    def slip_shutdown(self, platform, days):
+        """Move a platform's next shutdown by ``days`` (negative pulls it forward)."""
+        shutdowns = self['shutdowns']
+        mask = shutdowns['Platform'] == platform
+        if not mask.any():
+            raise ValueError(f"No shutdown planned for {platform}")
+        start = to_dates(shutdowns['Next_Shutdown'])
+        start = start.where(~mask, start + pd.Timedelta(days=days))
+        return self._replace('shutdowns', shutdowns.assign(Next_Shutdown=start),
+                             f"Slip {platform} shutdown by {days:+d} days")
+
+    def remove_tool_units(self, tool, units=1):
+        """Take ``units`` of a tool out of service for the whole plan."""
+        tools = self['tools']
+        mask = tools['Tool_Equipment'] == tool
+        if not mask.any():
+            raise ValueError(f"Unknown tool: {tool}")
+        available = tool_units(tools)
+        available = available.where(~mask, (available - units).clip(lower=0))
+        return self._replace('tools', tools.assign(Units=available),
+                             f"Lose {units} {tool} unit{'s' if units != 1 else ''}")
+
+    def defer_pm(self, platform, days):
+        """Push back Next_PM_Due for every well on ``platform``."""
+        wells = self['wells']
+        mask = (wells['Platform'] == platform).to_numpy()
+        if not mask.any():
+            raise ValueError(f"No wells on {platform}")
+        due = to_dates(wells['Next_PM_Due'])
+        due = due.where(~mask, due + pd.Timedelta(days=days))
+        return self._replace('wells', wells.assign(Next_PM_Due=due),
+                             f"Defer {platform} PMs by {days:+d} days")
+
+
+def to_dates(series):
+    """Parse a date column; categoricals are parsed once per category, not per row."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = pd.to_datetime(pd.Series(series.cat.categories), errors='coerce')
+        codes = series.cat.codes.to_numpy()
+        values = categories.to_numpy()[np.where(codes < 0, 0, codes)] if len(categories) else \
+            np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+        return pd.Series(values, index=series.index).where(codes >= 0)
+    return pd.to_datetime(series, errors='coerce')
+
+
+def tool_units(tools):
+    """Units in service per tool; one unit when the inventory does not say."""
+    if 'Units' not in tools.columns:
+        return pd.Series(1.0, index=tools.index)
+    return pd.to_numeric(tools['Units'], errors='coerce').fillna(1.0)
+
+
+def _cached(kpi, func, plan, frames, **params):
+    inputs = tuple(plan[f] for f in frames)
+    key = (kpi, tuple(id(df) for df in inputs), plan.as_of, tuple(sorted(params.items())))
+    with _KPI_CACHE_LOCK:
+        entry = _KPI_CACHE.get(key)
+        if entry is not None and all(a is b for a, b in zip(entry[0], inputs)):
+            _KPI_CACHE.move_to_end(key)
+            return entry[1]
+    # Computed outside the lock so sessions do not wait on each other's KPIs
+    result = func(*inputs, as_of=plan.as_of, **params)
+    with _KPI_CACHE_LOCK:
+        _KPI_CACHE[key] = (inputs, result)
+        if len(_KPI_CACHE) > MAX_CACHED_KPIS:
+            _KPI_CACHE.popitem(last=False)
+    return result
+
+
+def _pm_status(wells, as_of):
+    status, _ = pm_statuses(to_dates(wells['Next_PM_Due']), today=as_of)
+    counts = pd.crosstab(wells['Platform'].astype(str), status.to_numpy(), colnames=['PM_Status'])
+    return counts.reindex(columns=['Overdue', 'Due Soon', 'Scheduled', 'Unknown'], fill_value=0)
+
+
+def _pm_at_shutdown(wells, shutdowns, as_of):
+    del as_of  # relative to the shutdown date, not today
+    starts = pd.Series(to_dates(shutdowns['Next_Shutdown']).to_numpy(), index=shutdowns['Platform'].astype(str))
+    platform_start = wells['Platform'].astype(str).map(starts)
+    overdue = to_dates(wells['Next_PM_Due']) < platform_start
+    return overdue.groupby(wells['Platform'].astype(str)).sum().reindex(starts.index, fill_value=0).astype(int)
+
+
+def _tasks(schedule):
+    # Schedule rows as (platform, tool, start, end, personnel) with inclusive end dates
+    return pd.DataFrame({
+        'Platform': schedule['Platform'].astype(str),
+        'Tool': schedule['Tool'].astype(str),
+        'Start': to_dates(schedule['Start']),
+        'End': to_dates(schedule['End']),
+        'Personnel': schedule['Personnel'],
+    }).dropna(subset=['Start', 'End'])
+
+
+def _shutdown_tasks(shutdowns):
+    start = to_dates(shutdowns['Next_Shutdown'])
+    return pd.DataFrame({
+        'Platform': shutdowns['Platform'].astype(str),
+        'Tool': 'None',
+        'Start': start,
+        'End': start + pd.to_timedelta(shutdowns['Duration_Days'] - 1, unit='D'),
+        'Personnel': shutdowns['Crew'],
+    }).dropna(subset=['Start', 'End'])
+
+
+def _daily_load(groups, starts, ends, weights, day0, n_days):
+    # Difference array: +w on the first day, -w the day after the last, then cumsum
+    n_groups = int(groups.max()) + 1 if len(groups) else 0
+    load = np.zeros((n_groups, n_days + 1))
+    first = (starts - day0).dt.days.to_numpy()
+    last = (ends - day0).dt.days.to_numpy() + 1
+    np.add.at(load, (groups, first), weights)
+    np.add.at(load, (groups, last), -weights)
+    return np.cumsum(load, axis=1)[:, :n_days]
+
+
+def _horizon(activities):
+    day0 = activities['Start'].min()
+    return day0, (activities['End'].max() - day0).days + 1
+
+
+def _bed_utilisation(schedule, shutdowns, bed_space, as_of):
+    del as_of
+    activities = pd.concat([_tasks(schedule), _shutdown_tasks(shutdowns)], ignore_index=True)
+    platforms = bed_space['Platform'].astype(str)
+    result = pd.DataFrame({'Total_Beds': bed_space['Total_Beds'].to_numpy(), 'Peak_Beds': 0.0,
+                           'Peak_Utilisation_%': 0.0, 'Over_Capacity_Days': 0}, index=platforms)
+    activities = activities[activities['Platform'].isin(platforms)]
+    if activities.empty:
+        result['Peak_Beds'] = bed_space['Occupied_Beds'].to_numpy()
+    else:
+        day0, n_days = _horizon(activities)
+        groups = pd.Categorical(activities['Platform'], categories=platforms).codes
+        load = np.zeros((len(platforms), n_days))
+        daily = _daily_load(groups, activities['Start'], activities['End'],
+                            activities['Personnel'].to_numpy(dtype=float), day0, n_days)
+        load[:len(daily)] = daily
+        load += bed_space['Occupied_Beds'].to_numpy(dtype=float)[:, None]
+        result['Peak_Beds'] = load.max(axis=1)
+        result['Over_Capacity_Days'] = (load > result['Total_Beds'].to_numpy()[:, None]).sum(axis=1)
+    result['Peak_Utilisation_%'] = (100 * result['Peak_Beds'] / result['Total_Beds']).round(1)
+    return result
+
+
+def _tool_utilisation(schedule, tools, as_of):
+    del as_of
+    names = tools['Tool_Equipment'].astype(str)
+    units = tool_units(tools).to_numpy()
+    result = pd.DataFrame({'Units': units, 'Peak_Demand': 0.0, 'Peak_Utilisation_%': 0.0,
+                           'Conflict_Days': 0}, index=names)
+    tasks = _tasks(schedule)
+    tasks = tasks[tasks['Tool'].isin(names)]
+    if not tasks.empty:
+        day0, n_days = _horizon(tasks)
+        groups = pd.Categorical(tasks['Tool'], categories=names).codes
+        demand = np.zeros((len(names), n_days))
+        daily = _daily_load(groups, tasks['Start'], tasks['End'], np.ones(len(tasks)), day0, n_days)
+        demand[:len(daily)] = daily
+        result['Peak_Demand'] = demand.max(axis=1)
+        result['Conflict_Days'] = (demand > units[:, None]).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            utilisation = np.where(units > 0, 100 * result['Peak_Demand'] / units,
+                                   np.where(result['Peak_Demand'] > 0, np.inf, 0.0))
+        result['Peak_Utilisation_%'] = np.round(utilisation, 1)
+    return result
+
+
+def evaluate(plan):
+    """Detailed KPI frames for a plan, reusing cached results for shared frames."""
+    return {
+        'pm_status': _cached('pm_status', _pm_status, plan, ('wells',)),
+        'pm_at_shutdown': _cached('pm_at_shutdown', _pm_at_shutdown, plan, ('wells', 'shutdowns')),
+        'beds': _cached('beds', _bed_utilisation, plan, ('schedule', 'shutdowns', 'bed_space')),
+        'tools': _cached('tools', _tool_utilisation, plan, ('schedule', 'tools')),
+    }
+
+
+def summarize(plan):
+    """Headline KPIs for a plan as a Series."""
+    kpis = evaluate(plan)
+    pm, beds, tools = kpis['pm_status'], kpis['beds'], kpis['tools']
+    return pd.Series({
+        'Overdue PMs': int(pm['Overdue'].sum()),
+        'PMs Due Soon': int(pm['Due Soon'].sum()),
+        'PMs Due Before Shutdown': int(kpis['pm_at_shutdown'].sum()),
+        'Peak Bed Utilisation %': float(beds['Peak_Utilisation_%'].max()),
+        'Bed Over-Capacity Days': int(beds['Over_Capacity_Days'].sum()),
+        'Peak Tool Utilisation %': float(tools['Peak_Utilisation_%'].max()),
+        'Tool Conflict Days': int(tools['Conflict_Days'].sum()),
+    }, name=plan.name, dtype=object)
+
+
+def compare(plans):
+    """Side-by-side headline KPIs, one column per plan."""
+    return pd.concat([summarize(plan) for plan in plans], axis=1)